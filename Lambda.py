@@ -5,6 +5,8 @@ import dateutil.tz
 
 import json
 
+dublin_tz = dateutil.tz.gettz('Europe/Dublin')
+
 icci_timetable = {
 	"1":{"1":[[6,43],[8,37],[12,30],[14,3],[16,19],[18,7]],"2":[[6,43],[8,37],[12,31],[14,3],[16,20],[18,8]],"3":[[6,43],[8,37],[12,31],[14,4],[16,22],[18,9]],"4":[[6,43],[8,37],[12,32],[14,5],[16,23],[18,10]],"5":[[6,43],[8,36],[12,32],[14,6],[16,24],[18,11]],"6":[[6,43],[8,36],[12,32],[14,7],[16,25],[18,12]],"7":[[6,42],[8,35],[12,33],[14,8],[16,26],[18,13]],"8":[[6,42],[8,35],[12,33],[14,10],[16,28],[18,14]],"9":[[6,42],[8,34],[12,34],[14,11],[16,29],[18,15]],"10":[[6,41],[8,34],[12,34],[14,12],[16,31],[18,17]],"11":[[6,41],[8,33],[12,34],[14,13],[16,32],[18,18]],"12":[[6,41],[8,32],[12,35],[14,14],[16,34],[18,19]],"13":[[6,40],[8,31],[12,35],[14,16],[16,35],[18,20]],"14":[[6,39],[8,31],[12,36],[14,17],[16,37],[18,22]],"15":[[6,39],[8,30],[12,36],[14,18],[16,38],[18,23]],"16":[[6,38],[8,29],[12,36],[14,19],[16,40],[18,24]],"17":[[6,37],[8,28],[12,37],[14,21],[16,41],[18,26]],"18":[[6,37],[8,27],[12,37],[14,22],[16,43],[18,27]],"19":[[6,36],[8,26],[12,37],[14,24],[16,45],[18,28]],"20":[[6,35],[8,25],[12,38],[14,25],[16,47],[18,30]],"21":[[6,34],[8,23],[12,38],[14,26],[16,48],[18,31]],"22":[[6,33],[8,22],[12,38],[14,28],[16,50],[18,33]],"23":[[6,32],[8,21],[12,38],[14,29],[16,52],[18,34]],"24":[[6,31],[8,20],[12,39],[14,31],[16,54],[18,36]],"25":[[6,30],[8,18],[12,39],[14,32],[16,56],[18,37]],"26":[[6,29],[8,17],[12,39],[14,34],[16,57],[18,39]],"27":[[6,28],[8,15],[12,39],[14,35],[16,59],[18,41]],"28":[[6,27],[8,14],[12,40],[14,37],[17,1],[18,42]],"29":[[6,26],[8,12],[12,40],[14,38],[17,3],[18,44]],"30":[[6,24],[8,11],[12,40],[14,40],[17,5],[18,45]],"31":[[6,23],[8,9],[12,40],[14,41],[17,7],[18,47]]},
     "2":{"1":[[6,22],[8,8],[12,40],[14,43],[17,9],[18,49]],"2":[[6,20],[8,6],[12,40],[14,44],[17,11],[18,50]],"3":[[6,19],[8,4],[12,41],[14,46],[17,13],[18,52]],"4":[[6,18],[8,3],[12,41],[14,48],[17,15],[18,54]],"5":[[6,16],[8,1],[12,41],[14,49],[17,17],[18,55]],"6":[[6,15],[7,59],[12,41],[14,51],[17,19],[18,57]],"7":[[6,13],[7,57],[12,41],[14,52],[17,21],[18,59]],"8":[[6,12],[7,55],[12,41],[14,54],[17,23],[19,0]],"9":[[6,10],[7,54],[12,41],[14,55],[17,25],[19,2]],"10":[[6,8],[7,52],[12,41],[14,57],[17,26],[19,4]],"11":[[6,7],[7,50],[12,41],[14,58],[17,28],[19,5]],"12":[[6,5],[7,48],[12,41],[15,0],[17,30],[19,7]],"13":[[6,3],[7,46],[12,41],[15,2],[17,32],[19,9]],"14":[[6,2],[7,44],[12,41],[15,3],[17,34],[19,11]],"15":[[6,0],[7,42],[12,41],[15,5],[17,36],[19,12]],"16":[[5,58],[7,40],[12,41],[15,6],[17,38],[19,14]],"17":[[5,56],[7,38],[12,41],[15,8],[17,40],[19,16]],"18":[[5,55],[7,36],[12,41],[15,9],[17,42],[19,18]],"19":[[5,53],[7,34],[12,41],[15,11],[17,44],[19,19]],"20":[[5,51],[7,32],[12,41],[15,12],[17,46],[19,21]],"21":[[5,49],[7,29],[12,41],[15,14],[17,48],[19,23]],"22":[[5,47],[7,27],[12,41],[15,15],[17,50],[19,25]],"23":[[5,45],[7,25],[12,41],[15,17],[17,52],[19,26]],"24":[[5,43],[7,23],[12,40],[15,18],[17,54],[19,28]],"25":[[5,41],[7,21],[12,40],[15,19],[17,56],[19,30]],"26":[[5,39],[7,18],[12,40],[15,21],[17,58],[19,32]],"27":[[5,37],[7,16],[12,40],[15,22],[18,0],[19,33]],"28":[[5,35],[7,14],[12,40],[15,24],[18,2],[19,35]],"29":[[5,35],[7,14],[12,40],[15,24],[18,2],[19,35]]},
@@ -50,9 +52,9 @@ def next_prayer(today_prayers, now):
             break
 
     if next_prayer['Next prayer name'] == 'Al Fajr' and now.hour > today_prayers["Al Fajr"][0]:
-        next_prayer_datetime = datetime(now.year, now.month, now.day+1, next_prayer['Next prayer time'][0], next_prayer['Next prayer time'][1], tzinfo=dateutil.tz.gettz('Europe/Dublin'))
+        next_prayer_datetime = datetime(now.year, now.month, now.day+1, next_prayer['Next prayer time'][0], next_prayer['Next prayer time'][1], tzinfo=dublin_tz)
     else:
-        next_prayer_datetime = datetime(now.year, now.month, now.day, next_prayer['Next prayer time'][0], next_prayer['Next prayer time'][1], tzinfo=dateutil.tz.gettz('Europe/Dublin'))
+        next_prayer_datetime = datetime(now.year, now.month, now.day, next_prayer['Next prayer time'][0], next_prayer['Next prayer time'][1], tzinfo=dublin_tz)
     time_to_next_prayer = next_prayer_datetime - now
     next_prayer['Time to the next prayer'] = str(timedelta(seconds=time_to_next_prayer.seconds))
     next_prayer['Current prayer name'] = prayers[prayers.index(next_prayer['Next prayer name'])-1]
@@ -60,7 +62,6 @@ def next_prayer(today_prayers, now):
 
 
 def lambda_handler(event, context):
-    dublin_tz = dateutil.tz.gettz('Europe/Dublin')
     today = datetime.now(tz=dublin_tz)
     response = {'today prayers': get_azan_times(today)}
     response['next prayer'] = next_prayer(response['today prayers'], today)
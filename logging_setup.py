@@ -0,0 +1,105 @@
+#logging configuration for the Azan service.
+#records buffer in memory and flush to the rotating log file in batches,
+#which matters on the SD-card backed Pis this runs on: routine INFO/DEBUG
+#records cost no write syscalls until a batch (or an error) flushes them.
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import signal
+import threading
+import time
+
+logging_format = '%(asctime)s [%(levelname)s]: %(message)s'
+default_log_file = '/var/log/azan_service.log'
+
+_memory_handler = None
+_queue_listener = None
+
+
+class _PassthroughQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        #the queue never leaves this process, so skip the pickling-
+        #oriented pre-formatting the base class does.
+        return record
+
+
+class CachedFormatter(logging.Formatter):
+    """Formatter that reuses the rendered timestamp within one second.
+
+    strftime+localtime dominate per-record formatting cost; bursts of
+    records within the same second now pay it once. Milliseconds are
+    still taken from each record, so output is unchanged.
+    """
+
+    def __init__(self, fmt=None, datefmt=None):
+        super().__init__(fmt, datefmt)
+        self._tls = threading.local()
+        #the fast path below is hand-written for the service's one fixed
+        #format; any other format goes through the stock machinery.
+        self._plain = fmt == logging_format
+
+    def format(self, record):
+        if not self._plain or record.exc_info or record.exc_text or record.stack_info:
+            return super().format(record)
+        #build the line directly, skipping the %-style format parsing and
+        #the style-dispatch layer the base class runs per record.
+        return '{} [{}]: {}'.format(
+            self.formatTime(record), record.levelname, record.getMessage())
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        secs = int(record.created)
+        tls = self._tls
+        if getattr(tls, 'secs', None) != secs:
+            tls.secs = secs
+            tls.value = time.strftime(self.default_time_format, self.converter(record.created))
+        if self.default_msec_format:
+            return self.default_msec_format % (tls.value, record.msecs)
+        return tls.value
+
+
+def setup_logging(log_file=default_log_file, level=logging.DEBUG):
+    global _memory_handler, _queue_listener
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=1_000_000, backupCount=3, delay=True)
+    file_handler.setFormatter(CachedFormatter(logging_format))
+    #flushes on ERROR, on a full buffer, and at shutdown.
+    _memory_handler = logging.handlers.MemoryHandler(
+        capacity=100, flushLevel=logging.ERROR, target=file_handler)
+    #the emitting thread only enqueues; formatting and disk I/O happen on
+    #the listener thread, off the scheduler's critical path.
+    log_queue = queue.SimpleQueue()
+    _queue_listener = logging.handlers.QueueListener(
+        log_queue, _memory_handler, respect_handler_level=True)
+    _queue_listener.start()
+    root.addHandler(_PassthroughQueueHandler(log_queue))
+    root.setLevel(level)
+    atexit.register(flush_logging)
+    try:
+        signal.signal(signal.SIGTERM, _flush_and_exit)
+    except ValueError:
+        #not on the main thread; atexit still covers normal exits.
+        pass
+
+
+def flush_logging():
+    global _queue_listener
+    if _queue_listener is not None:
+        #stop() drains everything still queued into the memory handler.
+        _queue_listener.stop()
+        _queue_listener = None
+    if _memory_handler is not None:
+        _memory_handler.flush()
+
+
+def _flush_and_exit(signum, frame):
+    #systemd stops the service with SIGTERM; flush buffered records and
+    #let the normal shutdown path run.
+    flush_logging()
+    raise SystemExit(0)
@@ -0,0 +1,432 @@
+#!/usr/bin/env pipenv-shebang
+
+#single entry point for the Azan service.
+#pick the playback backend with --backend={chromecast,hass}; the speaker
+#name, the Home Assistant address and the API token live in adahn.config
+#(copy adahn.config.example), so no credentials are embedded in the source.
+
+import argparse
+import atexit
+import configparser
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import dateutil.tz
+import schedule
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from logging_setup import setup_logging
+
+#module-level logger: Logger.isEnabledFor results are cached on the
+#instance, so disabled debug calls cost a dict hit instead of a
+#hierarchy walk through the root logger.
+log = logging.getLogger(__name__)
+
+#resolved once; gettz re-resolves through a lock-guarded cache on every
+#call otherwise.
+dublin_tz = dateutil.tz.gettz('Europe/Dublin')
+
+#(url, volume) per prayer; one lookup fetches both.
+athan_media = {
+    'Al Fajr': ('https://www.gurutux.com/media/adhan_al_fajr.mp3', 0.2),
+    'elmesa7araty': ('https://www.gurutux.com/media/elmese7araty.mp3', 1),
+}
+default_athan_media = ('https://www.gurutux.com/media/azan.mp3', 0.5)
+
+azan_times_url = 'https://3kdru4h1tg.execute-api.eu-west-1.amazonaws.com/default/ICCI_next_prayer'
+azan_times_cache_dir = '/var/cache/azan'
+device_cache_file = '/var/lib/azan/device.json'
+default_config_path = 'adahn.config'
+
+#one session keeps the TCP+TLS connection warm across retries instead of
+#handshaking on every call; transient upstream errors are retried with
+#backoff inside the library.
+http_session = Session()
+http_session.headers['User-Agent'] = 'Automated-Azan'
+_retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+http_session.mount('https://', HTTPAdapter(max_retries=_retries))
+http_session.mount('http://', HTTPAdapter(max_retries=_retries))
+
+
+#memoized per path: callers treat the parsed config as read-only, so
+#repeat lookups share one parse instead of re-statting and re-reading
+#the file.
+@functools.lru_cache(maxsize=None)
+def load_config(path=default_config_path):
+    config = configparser.ConfigParser()
+    config.read(path)
+    return config
+
+
+def _prune_azan_times_cache():
+    #drop entries older than yesterday; ISO dates in the filenames
+    #compare lexicographically.
+    cutoff = (date.today() - timedelta(days=1)).isoformat()
+    try:
+        for name in os.listdir(azan_times_cache_dir):
+            if name.endswith('.json') and name[:-len('.json')] < cutoff:
+                os.unlink(os.path.join(azan_times_cache_dir, name))
+    except OSError:
+        pass
+
+
+def get_azan_times():
+    cache_file = os.path.join(azan_times_cache_dir, '{}.json'.format(date.today().isoformat()))
+    try:
+        with open(cache_file) as f:
+            today_timetable = json.load(f)
+        log.debug('loaded azan times from cache: %s', cache_file)
+        return today_timetable
+    except (OSError, ValueError):
+        pass
+    azan_times = http_session.get(azan_times_url, timeout=(10, 5))
+    today_timetable = azan_times.json()["today prayers"]
+    log.debug('get azan times url status code: %s', azan_times.status_code)
+    log.debug('get azan times url status data: %s', azan_times.json())
+    try:
+        os.makedirs(azan_times_cache_dir, exist_ok=True)
+        tmp_file = cache_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(today_timetable, f)
+        os.replace(tmp_file, cache_file)
+        _prune_azan_times_cache()
+    except OSError:
+        log.warning('could not cache azan times under %s', azan_times_cache_dir)
+    return today_timetable
+
+
+class _PlaybackListener:
+    """Media status listener that flags when playback finishes."""
+
+    def __init__(self):
+        self.finished = threading.Event()
+        self._playing = False
+
+    def reset(self):
+        self._playing = False
+        self.finished.clear()
+
+    def new_media_status(self, status):
+        if status.player_state == 'PLAYING':
+            self._playing = True
+        elif self._playing and status.player_state in ('IDLE', 'UNKNOWN'):
+            self.finished.set()
+
+    def load_media_failed(self, queue_item_id, error_code):
+        self.finished.set()
+
+
+class ChromecastBackend:
+    """Plays the Athan on a Google Home device or speaker group."""
+
+    def __init__(self, device_name, known_hosts=None):
+        self.device_name = device_name
+        #optional list of device IPs for networks where mDNS is blocked
+        #or flaky; zeroconf then probes these directly.
+        self.known_hosts = known_hosts
+        #cache the discovered device so the 5 second mDNS scan runs once
+        #per process instead of once per prayer.
+        self.casting_device = None
+        self.playback_listener = _PlaybackListener()
+        #one long-lived browser keeps known_devices current via mDNS
+        #callbacks, so lookups are a dict walk instead of a network scan.
+        self.known_devices = {}
+        self._devices_lock = threading.Lock()
+        self._device_seen = threading.Event()
+        self._browser = None
+        self._zconf = None
+
+    def _get_casting_device(self):
+        #imported lazily: pulling in pychromecast drags zeroconf and
+        #protobuf along (seconds of cold start on a Pi), and the hass
+        #backend never needs it.
+        import pychromecast
+        if self.casting_device is not None:
+            #a warm socket goes straight to play_media with no wait();
+            #only reconnect when the connection actually dropped.
+            if self.casting_device.socket_client.is_connected:
+                return self.casting_device
+            self.casting_device = None
+        device = self._connect_cached_host(pychromecast)
+        if device is None:
+            device = self._discover(pychromecast)
+        if device is not None:
+            device.logger.setLevel(20)
+            device.media_controller.register_status_listener(self.playback_listener)
+            self.casting_device = device
+        return self.casting_device
+
+    def _connect_cached_host(self, pychromecast):
+        #a direct TCP connect to the last known address costs one RTT,
+        #versus a multi-second multicast wait for mDNS discovery.
+        try:
+            with open(device_cache_file) as f:
+                cached = json.load(f)
+            host = (cached['host'], cached['port'], uuid.UUID(cached['uuid']), None, self.device_name)
+            device = pychromecast.get_chromecast_from_host(host)
+            device.wait(timeout=3)
+            return device
+        except Exception:
+            #missing or stale cache, fall back to mDNS discovery.
+            return None
+
+    def _start_browser(self, pychromecast):
+        if self._browser is not None:
+            return
+        import zeroconf
+
+        def add_cast(cast_uuid, service):
+            info = self._browser.devices.get(cast_uuid)
+            if info is None:
+                return
+            with self._devices_lock:
+                self.known_devices[cast_uuid] = info
+            if info.friendly_name == self.device_name:
+                self._device_seen.set()
+
+        def remove_cast(cast_uuid, service, cast_info):
+            with self._devices_lock:
+                self.known_devices.pop(cast_uuid, None)
+            if cast_info is not None and cast_info.friendly_name == self.device_name:
+                self._device_seen.clear()
+
+        self._zconf = zeroconf.Zeroconf()
+        self._browser = pychromecast.discovery.CastBrowser(
+            pychromecast.discovery.SimpleCastListener(add_cast, remove_cast),
+            self._zconf, self.known_hosts)
+        self._browser.start_discovery()
+        atexit.register(self._stop_browser)
+
+    def _stop_browser(self):
+        if self._browser is not None:
+            self._browser.stop_discovery()
+            self._browser = None
+        if self._zconf is not None:
+            self._zconf.close()
+            self._zconf = None
+
+    def _find_cast_info(self):
+        #single pass over the browser's live map, no network traffic: an
+        #exact name match returns immediately, otherwise fall back to the
+        #first Nest Mini the browser has seen.
+        target = self.device_name.lower()
+        first_mini = None
+        with self._devices_lock:
+            for info in self.known_devices.values():
+                if info.friendly_name.lower() == target:
+                    return info
+                if first_mini is None and info.model_name == 'Google Nest Mini':
+                    first_mini = info
+        return first_mini
+
+    def _discover(self, pychromecast):
+        self._start_browser(pychromecast)
+        #the browser is shared across the process lifetime; first use may
+        #need a few seconds for the device to announce itself.
+        self._device_seen.wait(timeout=5)
+        info = self._find_cast_info()
+        if info is None:
+            return None
+        device = pychromecast.get_chromecast_from_cast_info(info, self._zconf)
+        device.wait()
+        self._cache_device_host(device)
+        return device
+
+    def _cache_device_host(self, device):
+        try:
+            os.makedirs(os.path.dirname(device_cache_file), exist_ok=True)
+            tmp_file = device_cache_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump({'host': device.socket_client.host,
+                           'port': device.socket_client.port,
+                           'uuid': str(device.uuid)}, f)
+            os.replace(tmp_file, device_cache_file)
+        except OSError:
+            log.warning('could not cache device address under %s', device_cache_file)
+
+    def play(self, prayer):
+        azan_url, volume = athan_media.get(prayer, default_athan_media)
+        log.debug('playing %s at volume %s.', azan_url, volume)
+        device = self._get_casting_device()
+        if device is None:
+            log.error('could not find casting device %s.', self.device_name)
+            return
+        try:
+            self.playback_listener.reset()
+            cast_media_controller = device.media_controller
+            cast_media_controller.play_media(azan_url, 'audio/mp3')
+            device.set_volume(volume)
+            cast_media_controller.block_until_active()
+            #return as soon as the device reports the track ended instead
+            #of holding the worker a flat five minutes; the timeout only
+            #bounds the wait if the status update never arrives.
+            self.playback_listener.finished.wait(timeout=600)
+        except Exception:
+            #connection went stale, drop the cache so the next prayer
+            #rediscovers the device.
+            self.casting_device = None
+            raise
+
+
+class HassBackend:
+    """Plays the Athan through a Home Assistant media_player entity."""
+
+    def __init__(self, node, port, entity_id, api_token):
+        self.entity_id = entity_id
+        self.uri = 'http://{}:{}/api/services/media_player/play_media'.format(node, port)
+        self.headers = {'content-type': 'application/json',
+                        'Authorization': 'Bearer {}'.format(api_token)}
+
+    def play(self, prayer):
+        data = {'entity_id': self.entity_id,
+                'media_content_id': default_athan_media[0],
+                'media_content_type': 'music'}
+        response = http_session.post(self.uri, headers=self.headers, json=data, timeout=10)
+        log.debug('home assistant play_media status code: %s', response.status_code)
+
+
+class AthanScheduler:
+    """Fetches today's timetable and fires the backend at each prayer."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.tz = dublin_tz
+        self.prayer_times = {}
+        #playback blocks on socket I/O for minutes; run it off the
+        #scheduler thread so the next job can still fire on time. two
+        #workers cover a wake-up call overlapping an Athan.
+        self.cast_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cast')
+        atexit.register(self.cast_pool.shutdown, wait=False, cancel_futures=True)
+        #set from another thread to cut an idle wait short; the loop
+        #then re-reads the job table immediately instead of sleeping out
+        #the remainder of the interval.
+        self._wake = threading.Event()
+
+    def wake(self):
+        self._wake.set()
+
+    def load_prayer_times(self):
+        fetched = get_azan_times()
+        #normalize to (hour, minute) int tuples at the boundary so the
+        #scheduler never parses or validates time values; malformed API
+        #data surfaces here instead of mid-scheduling.
+        self.prayer_times = {prayer: (int(t[0]), int(t[1])) for prayer, t in fetched.items()}
+        log.debug('today\'s prayer times: %s', self.prayer_times)
+
+    def schedule_prayers(self):
+        #diff today's timetable against the registered jobs instead of a
+        #blanket clear+rebuild: a job whose time is unchanged stays
+        #registered, and the table is never momentarily empty between
+        #clearing and re-adding. fired jobs already removed themselves
+        #via CancelJob.
+        now = datetime.now(tz=self.tz)
+        #compare minute-of-day ints instead of building datetimes per
+        #prayer; also sidesteps tz-aware comparison pitfalls around DST.
+        now_minutes = now.hour * 60 + now.minute
+        log.debug('Generating today\'s jobs.')
+        leftover = {tag: job for job in schedule.jobs for tag in job.tags}
+        for prayer, azan_time in self.prayer_times.items():
+            if prayer == 'Al Duha':
+                continue
+            job = leftover.pop(prayer, None)
+            if job is not None:
+                if (job.at_time.hour, job.at_time.minute) == azan_time:
+                    continue
+                schedule.cancel_job(job)
+            if azan_time[0] * 60 + azan_time[1] > now_minutes:
+                at_time = '{:02}:{:02}'.format(azan_time[0], azan_time[1])
+                schedule.every().day.at(at_time).do(self.execute_azan, prayer).tag(prayer)
+        #whatever is left no longer appears in today's timetable.
+        for job in leftover.values():
+            schedule.cancel_job(job)
+        log.debug('Generated jobs: %s', schedule.get_jobs())
+
+    def execute_azan(self, prayer):
+        log.debug('**%s.**', prayer)
+        self.cast_pool.submit(self._play, prayer)
+        return schedule.CancelJob
+
+    def _play(self, prayer):
+        try:
+            self.backend.play(prayer)
+        except Exception:
+            log.exception('failed to play the Athan for %s.', prayer)
+
+    def run_scheduler(self):
+        #run today's jobs, then return shortly after midnight so the
+        #caller can fetch tomorrow's timetable; the refresh deadline is
+        #folded into the idle computation instead of a separate sleep.
+        now = datetime.now(tz=self.tz)
+        next_refresh = datetime(now.year, now.month, now.day, tzinfo=self.tz) + timedelta(days=1, minutes=5)
+        #tz-aware datetimes are built once per day up here; the loop
+        #itself runs on plain float timestamps, so an iteration costs a
+        #clock read instead of a datetime + tzinfo construction.
+        next_refresh_ts = next_refresh.timestamp()
+        while True:
+            log.debug('running pending jobs.')
+            schedule.run_pending()
+            now_ts = time.time()
+            if now_ts >= next_refresh_ts:
+                break
+            until_refresh = next_refresh_ts - now_ts
+            #one pass over the job list; schedule.idle_seconds would walk
+            #it again via next_run and read the clock a second time.
+            next_run = min((job.next_run for job in schedule.jobs), default=None)
+            if next_run is None:
+                #no jobs left today; sleep straight through to refresh.
+                sleep_for = until_refresh
+            else:
+                sleep_for = min(max(next_run.timestamp() - now_ts, 1), until_refresh)
+            #clamp the sleep so a long idle stretch still re-checks the
+            #job table at least hourly (clock adjustments, DST).
+            sleep_for = min(sleep_for, 3600)
+            log.debug('sleeping for %s hours.', sleep_for/60/60)
+            #an Event wait instead of time.sleep: a plain timeout expiry
+            #behaves identically, but wake() can interrupt it so changes
+            #take effect without waiting out the full interval.
+            if self._wake.wait(sleep_for):
+                self._wake.clear()
+
+
+def main():
+    #configured here rather than at import time, so importing this
+    #module never installs handlers behind the importer's back;
+    #setup_logging itself is a no-op if the root is already configured.
+    setup_logging()
+    parser = argparse.ArgumentParser(description='Automated Azan service.')
+    parser.add_argument('--backend', choices=['chromecast', 'hass'], default='chromecast',
+                        help='playback backend (default: chromecast)')
+    parser.add_argument('--config', default=default_config_path,
+                        help='path to the config file (default: adahn.config)')
+    args = parser.parse_args()
+    config = load_config(args.config)
+    if args.backend == 'hass':
+        backend = HassBackend(config.get('HomeAssistant', 'node'),
+                              config.get('HomeAssistant', 'port'),
+                              config.get('HomeAssistant', 'entity-id'),
+                              config.get('HomeAssistant', 'api-token'))
+    else:
+        known_hosts = config.get('Settings', 'known-hosts', fallback='').split() or None
+        backend = ChromecastBackend(config.get('Settings', 'speakers-group-name', fallback='Adahn'),
+                                    known_hosts=known_hosts)
+    #one scheduler for the life of the process: the daily refresh only
+    #refetches the timetable and rebuilds the job table, keeping the
+    #backend's device cache, browser and worker pool intact across days.
+    scheduler = AthanScheduler(backend)
+    while True:
+        scheduler.load_prayer_times()
+        scheduler.schedule_prayers()
+        scheduler.run_scheduler()
+
+
+if __name__ == "__main__":
+    main()